@@ -0,0 +1,216 @@
+# Cliente A2A assíncrono usado pelo orquestrador (orchestrator.py)
+#
+# Descobre os agentes pelo Agent Card em /.well-known/agent.json, guarda as
+# capacidades em cache e chama cada capacidade pelo `id` usando um único
+# httpx.AsyncClient com pool de conexões keep-alive (HTTP/2 quando o `h2`
+# estiver instalado e o agente falar HTTP/2; o uvicorn puro fala HTTP/1.1,
+# e aí as conexões keep-alive do pool são reaproveitadas).
+#
+# Cada chamada vira um "hop" no `Rastro` da requisição, com a duração total e
+# o tempo gasto dentro do agente (header Server-Timing, ver rag_startup.py).
+
+import re
+import time
+import uuid
+
+import httpx
+
+CARD_PATH = "/.well-known/agent.json"
+HEALTH_PATH = "/health" # Prontidão dos agentes (ver rag_startup.registrar_health)
+CARD_TTL = 300.0 # Segundos até redescobrir um agente
+
+LIMITES_POOL = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+# Gerar desafios pode levar dezenas de segundos (prazo do LLM + RAG)
+TIMEOUT_PADRAO = httpx.Timeout(90.0, connect=5.0, pool=5.0)
+
+
+class ErroA2A(Exception):
+    """Falha ao descobrir ou chamar um agente."""
+
+    def __init__(self, mensagem: str, status_code: int = 502, headers: dict = None):
+        super().__init__(mensagem)
+        self.status_code = status_code
+        # Headers a repassar para o cliente (ex: Retry-After de um agente carregando)
+        self.headers = headers
+
+
+class Rastro:
+    """Hops de uma requisição do orquestrador, na ordem em que começaram."""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.inicio = time.perf_counter()
+        self.hops = []
+
+    def registrar(self, agente: str, capacidade: str, url: str, inicio: float,
+                  status: int = None, tempo_agente_ms: float = None, erro: str = None):
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        hop = {
+            "agent": agente,
+            "capability": capacidade,
+            "url": url,
+            "status": status,
+            "start_ms": round((inicio - self.inicio) * 1000, 1),
+            "duration_ms": round(duracao_ms, 1),
+            "agent_ms": tempo_agente_ms,
+            # O que não foi gasto no agente: rede, fila do pool, serialização
+            "overhead_ms": round(duracao_ms - tempo_agente_ms, 1) if tempo_agente_ms is not None else None,
+            "error": erro,
+        }
+        self.hops.append(hop)
+        print(f"[trace {self.trace_id[:8]}] {agente}/{capacidade} {status} {hop['duration_ms']}ms (agente: {tempo_agente_ms}ms)")
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self.inicio) * 1000, 1)
+
+    def server_timing(self) -> str:
+        """Header Server-Timing com um item por hop (visível no DevTools)."""
+        itens = [
+            f'hop{i};desc="{hop["agent"]}/{hop["capability"]}";dur={hop["duration_ms"]}'
+            for i, hop in enumerate(self.hops)
+        ]
+        itens.append(f"total;dur={self.total_ms()}")
+        return ", ".join(itens)
+
+    def como_dict(self) -> dict:
+        # Cópia: hops em segundo plano (ex: pré-aquecimento) continuam chegando
+        return {"trace_id": self.trace_id, "total_ms": self.total_ms(), "hops": list(self.hops)}
+
+
+def _tempo_agente(resposta: httpx.Response):
+    encontrado = re.search(r"app;dur=([\d.]+)", resposta.headers.get("server-timing", ""))
+    return float(encontrado.group(1)) if encontrado else None
+
+
+def _detalhe(resposta: httpx.Response) -> str:
+    try:
+        return resposta.json().get("detail") or resposta.text
+    except Exception:
+        return resposta.text
+
+
+class CartaoAgente:
+    """Agent Card já validado, com as capacidades indexadas pelo `id`."""
+
+    def __init__(self, url_base: str, dados: dict):
+        if not isinstance(dados, dict):
+            raise ErroA2A(f"O Agent Card em {url_base} não é um objeto JSON.")
+        capacidades = dados.get("capabilities", [])
+        if not isinstance(capacidades, list):
+            raise ErroA2A(f"O Agent Card em {url_base} tem 'capabilities' inválido.")
+        self.capacidades = {}
+        for capacidade in capacidades:
+            if not (isinstance(capacidade, dict)
+                    and isinstance(capacidade.get("id"), str)
+                    and isinstance(capacidade.get("endpoint"), str)
+                    and capacidade["endpoint"].startswith("/")):
+                raise ErroA2A(f"O Agent Card em {url_base} tem uma capacidade inválida: {capacidade!r}")
+            self.capacidades[capacidade["id"]] = capacidade
+
+        self.url_base = url_base.rstrip("/")
+        self.dados = dados
+        self.id = dados.get("id")
+        self.nome = dados.get("name")
+        self.descoberto_em = time.monotonic()
+
+    @property
+    def expirado(self) -> bool:
+        return time.monotonic() - self.descoberto_em > CARD_TTL
+
+    def como_dict(self) -> dict:
+        return {
+            "url": self.url_base,
+            "id": self.id,
+            "name": self.nome,
+            "capabilities": list(self.capacidades),
+            "age_s": round(time.monotonic() - self.descoberto_em, 1),
+        }
+
+
+class ClienteA2A:
+    """Pool HTTP compartilhado + cache de Agent Cards por URL base."""
+
+    def __init__(self, timeout: httpx.Timeout = TIMEOUT_PADRAO):
+        try:
+            self.http = httpx.AsyncClient(http2=True, limits=LIMITES_POOL, timeout=timeout)
+        except ImportError:
+            # Sem o pacote `h2`: segue só com HTTP/1.1 keep-alive
+            self.http = httpx.AsyncClient(limits=LIMITES_POOL, timeout=timeout)
+        self.cartoes = {}
+
+    async def fechar(self):
+        await self.http.aclose()
+
+    async def descobrir(self, url_base: str, forcar: bool = False) -> CartaoAgente:
+        cartao = self.cartoes.get(url_base)
+        if cartao is not None and not cartao.expirado and not forcar:
+            return cartao
+        try:
+            resposta = await self.http.get(url_base.rstrip("/") + CARD_PATH)
+            resposta.raise_for_status()
+            cartao = CartaoAgente(url_base, resposta.json())
+        except (httpx.HTTPError, ValueError) as e:
+            self.cartoes.pop(url_base, None)
+            raise ErroA2A(f"Não foi possível descobrir o agente em {url_base}: {e}", status_code=503)
+        except ErroA2A:
+            # Card malformado: não fica em cache
+            self.cartoes.pop(url_base, None)
+            raise
+        self.cartoes[url_base] = cartao
+        return cartao
+
+    async def saude(self, url_base: str) -> dict:
+        """
+        Consulta o /health do agente. O card é servido mesmo enquanto o agente
+        carrega, então só o /health diz se as capacidades já respondem.
+        """
+        try:
+            resposta = await self.http.get(url_base.rstrip("/") + HEALTH_PATH, timeout=5.0)
+            corpo = resposta.json()
+        except (httpx.HTTPError, ValueError) as e:
+            return {"ready": False, "error": f"{type(e).__name__}: {e}"}
+        if not isinstance(corpo, dict):
+            corpo = {}
+        corpo["ready"] = resposta.status_code == 200 and corpo.get("ready", True) is True
+        return corpo
+
+    async def chamar(self, url_base: str, capacidade_id: str, payload: dict, rastro: Rastro,
+                     timeout: float = None) -> dict:
+        """Chama a capacidade `capacidade_id` do agente em `url_base`."""
+        cartao = await self.descobrir(url_base)
+        capacidade = cartao.capacidades.get(capacidade_id)
+        if capacidade is None:
+            raise ErroA2A(f"O agente '{cartao.nome}' não anuncia a capacidade '{capacidade_id}'.")
+
+        url = cartao.url_base + capacidade["endpoint"]
+        opcoes = {"timeout": timeout} if timeout is not None else {}
+        inicio = time.perf_counter()
+        try:
+            resposta = await self.http.request(
+                capacidade.get("method", "POST"), url, json=payload,
+                headers={"X-Trace-Id": rastro.trace_id}, **opcoes,
+            )
+        except httpx.HTTPError as e:
+            rastro.registrar(cartao.id, capacidade_id, url, inicio, erro=f"{type(e).__name__}: {e}")
+            # O agente pode ter reiniciado em outro endereço/versão: redescobre na próxima
+            self.cartoes.pop(url_base, None)
+            status = 504 if isinstance(e, httpx.TimeoutException) else 503
+            raise ErroA2A(f"Falha ao chamar '{cartao.nome}' ({capacidade_id}): {type(e).__name__}", status_code=status)
+
+        rastro.registrar(cartao.id, capacidade_id, url, inicio, status=resposta.status_code,
+                         tempo_agente_ms=_tempo_agente(resposta),
+                         erro=None if resposta.is_success else _detalhe(resposta))
+        if not resposta.is_success:
+            # Repassa 503 (agente carregando, com o Retry-After dele) e 504 (o
+            # agente estourou o prazo do LLM, ver llm_client.TimeoutLLM); o resto vira 502
+            status = resposta.status_code if resposta.status_code in (503, 504) else 502
+            retry_after = resposta.headers.get("retry-after")
+            raise ErroA2A(f"'{cartao.nome}' respondeu {resposta.status_code}: {_detalhe(resposta)}",
+                          status_code=status, headers={"Retry-After": retry_after} if retry_after else None)
+        try:
+            corpo = resposta.json()
+        except ValueError:
+            corpo = None
+        if not isinstance(corpo, dict):
+            raise ErroA2A(f"'{cartao.nome}' ({capacidade_id}) respondeu {resposta.status_code} sem um objeto JSON.")
+        return corpo
@@ -1,106 +1,25 @@
 # Nome sugerido para este arquivo: challenge_agent.py
 
-import os
-import requests
 import json
-from io import BytesIO
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Any, List
 from operator import itemgetter # <<< ADICIONADO
 
-# Importações do LangChain
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
-from langchain.schema.output_parser import StrOutputParser
-
 # Carregue sua chave de API a partir de um arquivo .env (recomendado)
 from dotenv import load_dotenv
 load_dotenv()
 
-# --- CONFIGURAÇÃO INICIAL E CARREGAMENTO DO MODELO ---
-model_name = "sentence-transformers/all-MiniLM-L6-v2"
-model_kwargs = {'device': 'cpu'}
-encode_kwargs = {'normalize_embeddings': False}
-
-try:
-    embeddings = HuggingFaceEmbeddings(
-        model_name=model_name,
-        model_kwargs=model_kwargs,
-        encode_kwargs=encode_kwargs
-    )
-except Exception as e:
-    print(f"Erro ao carregar o modelo de embedding: {e}")
-    exit()
-
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.8) # Temperatura um pouco mais alta
-
-# --- Lógica de carregamento de múltiplos documentos ---
-lista_de_documentos_pdf = [
-    "Documentação Syna.pdf",
-    "Python do ZERO à Programação Orientada a Objetos (Fernando Belomé Feltrin).pdf"
-    # Adicione aqui os PDFs de JavaScript, C++, Cachorros, etc.
-]
-documentos_totais = []
-print("Iniciando o carregamento dos documentos locais (Agente de Desafios)...")
-for caminho_do_pdf in lista_de_documentos_pdf:
-    try:
-        if not os.path.exists(caminho_do_pdf):
-            print(f"Erro: Arquivo não encontrado no caminho: {caminho_do_pdf}")
-            print(f"Pulando o arquivo '{caminho_do_pdf}'...")
-            continue
-        loader = PyPDFLoader(caminho_do_pdf)
-        paginas = loader.load()
-        documentos_totais.extend(paginas)
-        print(f"Documento '{caminho_do_pdf}' carregado com sucesso ({len(paginas)} páginas).")
-    except Exception as e:
-        print(f"Erro ao processar o PDF '{caminho_do_pdf}': {e}")
-        print(f"Pulando o arquivo '{caminho_do_pdf}'...")
-print(f"\nCarregamento concluído. Total de páginas de todos os documentos: {len(documentos_totais)}")
-
-# --- Dividir os documentos e criar o Vector DB ---
-vector_db = None
-if documentos_totais:
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
-    chunks = text_splitter.split_documents(documentos_totais)
-    print(f"Criando Vector DB com {len(chunks)} chunks de {len(lista_de_documentos_pdf)} documento(s)...")
-    vector_db = FAISS.from_documents(chunks, embeddings)
-    
-    retriever = vector_db.as_retriever(
-        search_type="mmr",
-        search_kwargs={"k": 10, "fetch_k": 30}
-    )
-    print("Vector DB (MMR) criado com sucesso!")
-else:
-    print("Nenhum documento foi carregado. A API não pode iniciar o RAG.")
-    retriever = None
-
-# --- DEFINIÇÃO DA API COM FASTAPI ---
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-class ChatRequest(BaseModel):
-    message: str
-    num_questions: int = 3 # <<< MODIFICADO: Adicionado com padrão 3
+# As importações do LangChain, o modelo de embedding e o Vector DB são
+# carregados em segundo plano no startup (ver rag_startup.py)
+from rag_startup import EstadoRAG, criar_lifespan, registrar_health, registrar_server_timing
+from llm_client import TimeoutLLM, ErroLLM
 
-class ChallengeResponse(BaseModel):
-    challenges: List[Any] 
+rag = EstadoRAG("desafios")
 
 # <<< INÍCIO DA MODIFICAÇÃO DO PROMPT >>>
-prompt_template_desafio = ChatPromptTemplate.from_template("""
+PROMPT_TEMPLATE_DESAFIO = """
     Você é um "Mestre de Desafios" e sua especialidade é criar desafios de múltipla escolha com base em documentações técnicas, formatando a saída como um array JSON.
 
     Baseado no CONTEXTO (documentação) abaixo, crie {num_questions} DESAFIOS ESPECÍFICOS sobre a ÁREA DE APRENDIZADO (TÓPICO) fornecida.
@@ -149,9 +68,38 @@ prompt_template_desafio = ChatPromptTemplate.from_template("""
     ]
 
     ARRAY JSON DE {num_questions} DESAFIOS GERADOS:
-""")
+"""
 # <<< FIM DA MODIFICAÇÃO DO PROMPT >>>
 
+# --- DEFINIÇÃO DA API COM FASTAPI ---
+app = FastAPI(lifespan=criar_lifespan(
+    rag,
+    modelo_llm="gemini-2.5-flash",
+    temperatura=0.8, # Temperatura um pouco mais alta
+    prazo_llm=60.0, # Gerar N desafios em JSON é a chamada mais longa
+    timeout_tentativa_llm=60.0, # Uma única geração pode usar o prazo inteiro
+    texto_prompt=PROMPT_TEMPLATE_DESAFIO,
+    retriever_kwargs={"search_type": "mmr", "search_kwargs": {"k": 10, "fetch_k": 30}},
+    rotulo=" (Agente de Desafios)",
+))
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+registrar_server_timing(app)
+
+class ChatRequest(BaseModel):
+    message: str
+    num_questions: int = 3 # <<< MODIFICADO: Adicionado com padrão 3
+
+class ChallengeResponse(BaseModel):
+    challenges: List[Any] 
+
 AGENT_CARD = {
   "a2a_version": "0.1.0",
   "id": "agent-challenge-generator-v1",
@@ -186,6 +134,8 @@ AGENT_CARD = {
 async def get_agent_card():
     return AGENT_CARD
 
+registrar_health(app, rag)
+
 # <<< INÍCIO DA MODIFICAÇÃO DA FUNÇÃO >>>
 @app.post("/api/challenge", response_model=ChallengeResponse)
 async def generate_challenge(request: ChatRequest) -> ChallengeResponse:
@@ -195,28 +145,29 @@ async def generate_challenge(request: ChatRequest) -> ChallengeResponse:
         "type": "error", "difficulty": "none"
     }
 
-    if not retriever:
+    rag.exigir_pronto()
+
+    if not rag.retriever:
         error_challenge["description"] = "O sistema de busca (RAG) não foi inicializado."
         return ChallengeResponse(challenges=[error_challenge]) 
 
     # MODIFICADO: A chain agora espera um dicionário com "message" e "num_questions"
     rag_chain = (
         {
-            "context": itemgetter("message") | retriever,
+            "context": itemgetter("message") | rag.retriever,
             "question": itemgetter("message"),
             "num_questions": itemgetter("num_questions")
         }
-        | prompt_template_desafio
-        | llm
-        | StrOutputParser()
+        | rag.prompt
     )
 
     try:
         # MODIFICADO: Passa o dicionário para o invoke
-        bot_response_string = rag_chain.invoke({
+        mensagens = await rag_chain.ainvoke({
             "message": request.message,
             "num_questions": request.num_questions
         })
+        bot_response_string = await rag.llm.ainvoke(mensagens)
         
         try:
             # Limpeza
@@ -249,6 +200,12 @@ async def generate_challenge(request: ChatRequest) -> ChallengeResponse:
              error_challenge["description"] = "O assistente não retornou a estrutura de array esperada. Tente gerar novamente."
              return ChallengeResponse(challenges=[error_challenge])
 
+    # LLM fora do prazo ou fora do ar: 504/502 (como no main.py), em vez de um
+    # desafio de erro com status 200
+    except TimeoutLLM as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ErroLLM as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         print(f"Erro inesperado na chain RAG: {e}")
         error_challenge["description"] = f"Erro interno no servidor: {e}"
@@ -0,0 +1,42 @@
+# Upstream falso para exercitar o ClienteLLM (llm_client.py) sem chamar o Gemini
+#
+# `ModeloFalso` imita um chat model do LangChain (tem `ainvoke`) com latência,
+# travamentos e erros transitórios configuráveis. Os cenários de cada
+# comportamento do cliente estão em test_llm_client.py:
+#
+#     python -m pytest test_llm_client.py  (pytest: requirements-dev.txt)
+
+import asyncio
+
+
+class ErroUpstreamFalso(Exception):
+    """Erro com código HTTP, como os do google.api_core."""
+
+    def __init__(self, code: int, mensagem: str = "erro simulado"):
+        super().__init__(f"{code} {mensagem}")
+        self.code = code
+
+
+class ModeloFalso:
+    """
+    Chat model falso. `roteiro` é uma lista de ações consumidas a cada
+    chamada (a última se repete):
+        ("ok", latencia)    responde após `latencia` segundos
+        ("erro", codigo)    levanta ErroUpstreamFalso(codigo)
+        ("trava", None)     nunca responde (até ser cancelado)
+    """
+
+    def __init__(self, nome: str, roteiro: list):
+        self.nome = nome
+        self.roteiro = list(roteiro)
+        self.chamadas = 0
+
+    async def ainvoke(self, entrada):
+        acao, valor = self.roteiro[min(self.chamadas, len(self.roteiro) - 1)]
+        self.chamadas += 1
+        if acao == "erro":
+            raise ErroUpstreamFalso(valor)
+        if acao == "trava":
+            await asyncio.Event().wait()
+        await asyncio.sleep(valor)
+        return f"{self.nome}: resposta para {entrada!r}"
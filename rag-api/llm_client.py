@@ -0,0 +1,264 @@
+# Camada de cliente LLM compartilhada pelos três agentes
+#
+# Envolve os modelos do LangChain (ou qualquer objeto com `ainvoke`) com:
+#   * prazo (deadline) por endpoint, aplicado a todas as tentativas somadas;
+#   * retries com backoff exponencial e jitter em erros transitórios;
+#   * hedged requests opcionais: se a tentativa passar do p95 observado,
+#     uma segunda chamada idêntica é disparada e vence a que terminar primeiro;
+#   * fallback para um modelo mais rápido (ex: pro -> flash) quando o tempo
+#     restante não comporta a latência esperada do modelo principal.
+#
+# Os modelos do LangChain são criados com max_retries=0 para que os retries
+# fiquem só aqui. Veja fake_upstream.py para simular cada comportamento.
+
+import asyncio
+import random
+import time
+from collections import deque
+
+# Erros considerados transitórios (vale a pena tentar de novo)
+CODIGOS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+NOMES_TRANSITORIOS = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "TooManyRequests", "GatewayTimeout",
+    "BadGateway", "Aborted", "RemoteProtocolError", "ConnectError",
+    "ReadTimeout", "ConnectTimeout",
+}
+# Erros que indicam que o modelo não respondeu a tempo (o transporte do Gemini
+# usa o mesmo timeout da tentativa, então qualquer um dos dois pode disparar)
+CODIGOS_TIMEOUT = {408, 504}
+NOMES_TIMEOUT = {"DeadlineExceeded", "GatewayTimeout", "ReadTimeout", "ConnectTimeout"}
+
+
+class ErroLLM(Exception):
+    """Falha definitiva ao chamar o LLM (após retries e fallback)."""
+
+
+class TimeoutLLM(ErroLLM):
+    """O prazo do endpoint acabou antes de uma resposta do LLM."""
+
+
+def erro_transitorio(e: BaseException) -> bool:
+    while e is not None:
+        if isinstance(e, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+            return True
+        if type(e).__name__ in NOMES_TRANSITORIOS:
+            return True
+        codigo = getattr(e, "code", None) or getattr(e, "status_code", None)
+        try:
+            if int(codigo) in CODIGOS_TRANSITORIOS:
+                return True
+        except (TypeError, ValueError):
+            pass
+        e = e.__cause__
+    return False
+
+
+def erro_de_timeout(e: BaseException) -> bool:
+    while e is not None:
+        if isinstance(e, (asyncio.TimeoutError, TimeoutError)):
+            return True
+        if type(e).__name__ in NOMES_TIMEOUT:
+            return True
+        codigo = getattr(e, "code", None) or getattr(e, "status_code", None)
+        try:
+            if int(codigo) in CODIGOS_TIMEOUT:
+                return True
+        except (TypeError, ValueError):
+            pass
+        e = e.__cause__
+    return False
+
+
+def _texto(resposta) -> str:
+    """Extrai o texto da resposta (equivalente ao StrOutputParser)."""
+    conteudo = getattr(resposta, "content", resposta)
+    if isinstance(conteudo, list):
+        return "".join(
+            parte if isinstance(parte, str) else parte.get("text", "")
+            for parte in conteudo
+        )
+    return str(conteudo)
+
+
+class EstatisticasLatencia:
+    """Janela móvel das latências de sucesso de um modelo (em segundos)."""
+
+    def __init__(self, tamanho: int = 200):
+        self.amostras = deque(maxlen=tamanho)
+
+    def registrar(self, latencia: float):
+        self.amostras.append(latencia)
+
+    def percentil(self, p: float):
+        if not self.amostras:
+            return None
+        ordenadas = sorted(self.amostras)
+        indice = min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))
+        return ordenadas[indice]
+
+
+class ClienteLLM:
+    """
+    Cliente resiliente sobre um modelo principal e um fallback opcional.
+
+    `ainvoke(entrada, prazo=...)` retorna o texto da resposta ou levanta
+    TimeoutLLM/ErroLLM. Erros não transitórios são propagados sem retry.
+    """
+
+    def __init__(self, modelo, nome: str, *, fallback=None, nome_fallback: str = None,
+                 prazo_padrao: float = 60.0, timeout_tentativa: float = None,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 hedge: bool = False, hedge_min_amostras: int = 20,
+                 latencia_esperada: float = 10.0):
+        self.modelo = modelo
+        self.nome = nome
+        self.fallback = fallback
+        self.nome_fallback = nome_fallback
+        self.prazo_padrao = prazo_padrao
+        # Limite de cada tentativa; None deixa uma única chamada usar o prazo inteiro
+        self.timeout_tentativa = timeout_tentativa
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_amostras = hedge_min_amostras
+        # Estimativa usada para o fallback enquanto não há amostras suficientes
+        self.latencia_esperada = latencia_esperada
+        self.latencias = {nome: EstatisticasLatencia()}
+        if fallback is not None:
+            self.latencias[nome_fallback] = EstatisticasLatencia()
+        self.contadores = {"chamadas": 0, "retries": 0, "hedges": 0, "fallbacks": 0, "timeouts": 0}
+
+    # --- Decisões ---
+
+    def _p95(self, nome: str):
+        estat = self.latencias[nome]
+        if len(estat.amostras) < self.hedge_min_amostras:
+            return None
+        return estat.percentil(95)
+
+    def _escolher_modelo(self, restante: float, falhou_por_timeout: bool):
+        """Usa o fallback quando o orçamento restante está em risco."""
+        if self.fallback is None:
+            return self.modelo, self.nome
+        esperado = self._p95(self.nome) or self.latencia_esperada
+        if falhou_por_timeout or restante < esperado:
+            self.contadores["fallbacks"] += 1
+            return self.fallback, self.nome_fallback
+        return self.modelo, self.nome
+
+    def _espera_backoff(self, tentativa: int) -> float:
+        # "Full jitter": uniforme entre 0 e o teto exponencial
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** tentativa))
+
+    # --- Execução ---
+
+    async def _chamar(self, modelo, nome: str, entrada):
+        inicio = time.monotonic()
+        resposta = await modelo.ainvoke(entrada)
+        self.latencias[nome].registrar(time.monotonic() - inicio)
+        return resposta
+
+    async def _tentar(self, modelo, nome: str, entrada, timeout: float):
+        """Uma tentativa, com hedge opcional após o p95 do modelo."""
+        atraso_hedge = self._p95(nome) if self.hedge else None
+        if atraso_hedge is None or atraso_hedge >= timeout:
+            return await asyncio.wait_for(self._chamar(modelo, nome, entrada), timeout)
+
+        tarefas = {asyncio.ensure_future(self._chamar(modelo, nome, entrada))}
+        try:
+            return await asyncio.wait_for(self._corrida(tarefas, modelo, nome, entrada, atraso_hedge), timeout)
+        finally:
+            # Cancela a chamada perdedora e descarta erros que ninguém leu
+            for tarefa in tarefas:
+                if tarefa.done():
+                    if not tarefa.cancelled():
+                        tarefa.exception()
+                else:
+                    tarefa.cancel()
+
+    async def _corrida(self, tarefas: set, modelo, nome: str, entrada, atraso_hedge: float):
+        feitas, _ = await asyncio.wait(tarefas, timeout=atraso_hedge)
+        if not feitas:
+            self.contadores["hedges"] += 1
+            tarefas.add(asyncio.ensure_future(self._chamar(modelo, nome, entrada)))
+        erro = None
+        pendentes = set(tarefas)
+        while pendentes:
+            feitas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in feitas:
+                if tarefa.exception() is None:
+                    return tarefa.result()
+                erro = tarefa.exception()
+        raise erro
+
+    async def ainvoke(self, entrada, prazo: float = None) -> str:
+        prazo = prazo or self.prazo_padrao
+        limite = time.monotonic() + prazo
+        self.contadores["chamadas"] += 1
+        tentativa = 0
+        falhou_por_timeout = False
+
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                self.contadores["timeouts"] += 1
+                raise TimeoutLLM(f"O LLM não respondeu dentro do prazo de {prazo:g}s.")
+
+            modelo, nome = self._escolher_modelo(restante, falhou_por_timeout)
+            try:
+                timeout = restante if self.timeout_tentativa is None else min(restante, self.timeout_tentativa)
+                resposta = await self._tentar(modelo, nome, entrada, timeout)
+                return _texto(resposta)
+            except Exception as e:
+                if not erro_transitorio(e):
+                    raise
+                falhou_por_timeout = erro_de_timeout(e)
+                print(f"Erro transitório no LLM '{nome}' (tentativa {tentativa + 1}): {type(e).__name__} {e}".rstrip())
+                if tentativa >= self.max_retries:
+                    if falhou_por_timeout:
+                        self.contadores["timeouts"] += 1
+                        raise TimeoutLLM(f"O LLM não respondeu dentro do prazo de {prazo:g}s.") from e
+                    raise ErroLLM(f"O LLM falhou após {tentativa + 1} tentativas: {e}") from e
+
+            espera = self._espera_backoff(tentativa)
+            if time.monotonic() + espera >= limite:
+                self.contadores["timeouts"] += 1
+                raise TimeoutLLM(f"O LLM não respondeu dentro do prazo de {prazo:g}s.")
+            tentativa += 1
+            self.contadores["retries"] += 1
+            await asyncio.sleep(espera)
+
+    def como_dict(self) -> dict:
+        latencias = {}
+        for nome, estat in self.latencias.items():
+            latencias[nome] = {
+                "amostras": len(estat.amostras),
+                "p50_s": estat.percentil(50),
+                "p95_s": estat.percentil(95),
+            }
+        return {
+            "model": self.nome,
+            "fallback": self.nome_fallback,
+            "hedge": self.hedge,
+            "latency": latencias,
+            **self.contadores,
+        }
+
+
+def criar_cliente_gemini(modelo_llm: str, temperatura: float, *, modelo_fallback: str = None,
+                         prazo_padrao: float = 60.0, timeout_tentativa: float = None,
+                         **opcoes) -> ClienteLLM:
+    """Cria um ClienteLLM com ChatGoogleGenerativeAI (importado só aqui)."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    def criar(nome):
+        # Os retries e o timeout são controlados pelo ClienteLLM; o timeout do
+        # transporte só precisa não cortar uma tentativa antes dele
+        return ChatGoogleGenerativeAI(model=nome, temperature=temperatura, max_retries=0,
+                                      timeout=timeout_tentativa or prazo_padrao)
+
+    fallback = criar(modelo_fallback) if modelo_fallback else None
+    return ClienteLLM(criar(modelo_llm), modelo_llm, fallback=fallback, nome_fallback=modelo_fallback,
+                      prazo_padrao=prazo_padrao, timeout_tentativa=timeout_tentativa, **opcoes)
@@ -1,109 +1,22 @@
-import os
-import requests
-from io import BytesIO
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-# Importações do LangChain
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings 
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
-from langchain.schema.output_parser import StrOutputParser
-
 # Carregue sua chave de API a partir de um arquivo .env (recomendado)
 from dotenv import load_dotenv
 load_dotenv()
 
-# --- CONFIGURAÇÃO INICIAL E CARREGAMENTO DO MODELO ---
-
-# Modelo de embedding que será usado
-model_name = "sentence-transformers/all-MiniLM-L6-v2"
-model_kwargs = {'device': 'cpu'}
-encode_kwargs = {'normalize_embeddings': False}
-
-try:
-    embeddings = HuggingFaceEmbeddings(
-        model_name=model_name,
-        model_kwargs=model_kwargs,
-        encode_kwargs=encode_kwargs
-    )
-except Exception as e:
-    print(f"Erro ao carregar o modelo de embedding: {e}")
-    exit()
-
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.3) 
-
+# As importações do LangChain, o modelo de embedding e o Vector DB são
+# carregados em segundo plano no startup (ver rag_startup.py)
+from rag_startup import EstadoRAG, criar_lifespan, registrar_health, registrar_server_timing
+from llm_client import TimeoutLLM, ErroLLM
 
-lista_de_documentos_pdf = [
-    "Documentação Syna.pdf",
-    "Python do ZERO à Programação Orientada a Objetos (Fernando Belomé Feltrin).pdf"
-]
-# -------------------------------------
-
-documentos_totais = []
-print("Iniciando o carregamento dos documentos locais...")
-
-# Itera sobre a lista de arquivos que você definiu
-for caminho_do_pdf in lista_de_documentos_pdf:
-    try:
-        # Verifica se o arquivo existe antes de tentar carregar
-        if not os.path.exists(caminho_do_pdf):
-            print(f"Erro: Arquivo não encontrado no caminho: {caminho_do_pdf}")
-            print(f"Pulando o arquivo '{caminho_do_pdf}'...")
-            continue # Pula para o próximo arquivo da lista
-            
-        loader = PyPDFLoader(caminho_do_pdf)
-        paginas = loader.load()
-        documentos_totais.extend(paginas)
-        print(f"Documento '{caminho_do_pdf}' carregado com sucesso ({len(paginas)} páginas).")
-
-    except Exception as e:
-        print(f"Erro ao processar o PDF '{caminho_do_pdf}': {e}")
-        print(f"Pulando o arquivo '{caminho_do_pdf}'...")
-
-print(f"\nCarregamento concluído. Total de páginas de todos os documentos: {len(documentos_totais)}")
-
-# Dividir os documentos em chunks e criar o Vector DB
-vector_db = None
-if documentos_totais:
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
-    chunks = text_splitter.split_documents(documentos_totais)
-    
-    print(f"Criando Vector DB com {len(chunks)} chunks de {len(lista_de_documentos_pdf)} documento(s)...")
-    vector_db = FAISS.from_documents(chunks, embeddings)
-    retriever = vector_db.as_retriever(search_kwargs={"k": 5})
-    print("Vector DB criado com sucesso!")
-else:
-    print("Nenhum documento foi carregado. A API não pode iniciar o RAG.")
-    retriever = None
+rag = EstadoRAG("chat")
 
 # --- DEFINIÇÃO DA API COM FASTAPI ---
 
-app = FastAPI()
-
-# Configuração do CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:8080"], 
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Modelos Pydantic
-class ChatRequest(BaseModel):
-    message: str
-
-class ChatResponse(BaseModel):
-    response: str
-
 # Prompt Template (o mesmo de antes, focado na documentação)
-prompt_template = ChatPromptTemplate.from_template("""
+PROMPT_TEMPLATE = """
     Você é um assistente especializado em responder perguntas sobre documentações  ".
     Sua missão é ajudar o usuário a entender como os projetos funcionam, quais são suas regras, linguagens, frameworks, limitações e base de conhecimento, com base no documento fornecido.
 
@@ -129,24 +42,62 @@ prompt_template = ChatPromptTemplate.from_template("""
     {question}
 
     RESPOSTA DO ASSISTENTE:
-""")
+"""
+
+app = FastAPI(lifespan=criar_lifespan(
+    rag,
+    modelo_llm="gemini-2.5-flash",
+    temperatura=0.3,
+    prazo_llm=30.0, # Prazo total (retries incluídos) para responder o chat
+    timeout_tentativa_llm=20.0, # Deixa tempo para um retry dentro do prazo
+    texto_prompt=PROMPT_TEMPLATE,
+    retriever_kwargs={"search_kwargs": {"k": 5}},
+))
+
+# Configuração do CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:8080"], 
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+registrar_server_timing(app)
+
+# Modelos Pydantic
+class ChatRequest(BaseModel):
+    message: str
+
+class ChatResponse(BaseModel):
+    response: str
+
+registrar_health(app, rag)
 
 # Endpoint da API
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest) -> ChatResponse:
-    if not retriever:
+    rag.exigir_pronto()
+
+    if not rag.retriever:
         return ChatResponse(response="Desculpe, o sistema de busca (RAG) não foi inicializado corretamente pois nenhum documento foi carregado.")
 
-    # Monta a chain de RAG
+    from langchain.schema.runnable import RunnablePassthrough
+
+    # Monta a chain de RAG (busca + prompt); o LLM é chamado pelo ClienteLLM
     rag_chain = (
-        {"context": retriever, "question": RunnablePassthrough()}
-        | prompt_template
-        | llm
-        | StrOutputParser()
+        {"context": rag.retriever, "question": RunnablePassthrough()}
+        | rag.prompt
     )
     
     # Invoca a chain e obtém a resposta
-    bot_response = rag_chain.invoke(request.message)
+    try:
+        mensagens = await rag_chain.ainvoke(request.message)
+        bot_response = await rag.llm.ainvoke(mensagens)
+    except TimeoutLLM as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ErroLLM as e:
+        raise HTTPException(status_code=502, detail=str(e))
     
     return ChatResponse(response=bot_response)
 
@@ -0,0 +1,240 @@
+# Nome sugerido para este arquivo: orchestrator.py
+# Orquestrador A2A: o front-end faz uma única chamada e este serviço conversa
+# com os agentes (descobertos pelos Agent Cards) usando um pool keep-alive.
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Any, List
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from a2a_client import CartaoAgente, ClienteA2A, ErroA2A, Rastro
+
+# --- CONFIGURAÇÃO ---
+CHALLENGE_AGENT_URL = os.getenv("CHALLENGE_AGENT_URL", "http://localhost:8001")
+VALIDATION_AGENT_URL = os.getenv("VALIDATION_AGENT_URL", "http://localhost:8002")
+AGENTES = [CHALLENGE_AGENT_URL, VALIDATION_AGENT_URL]
+
+# Validações em paralelo por prova (cada uma é uma chamada ao LLM)
+MAX_VALIDACOES_PARALELAS = 5
+
+a2a = None
+# Pré-aquecimentos em andamento (a referência evita que o GC cancele as tarefas)
+tarefas_prewarm = set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global a2a
+    a2a = ClienteA2A()
+    # Descobre os agentes em segundo plano; quem ainda não subiu é
+    # redescoberto na primeira chamada
+    tarefa = asyncio.create_task(descobrir_agentes())
+    yield
+    tarefa.cancel()
+    for tarefa_prewarm in tarefas_prewarm:
+        tarefa_prewarm.cancel()
+    await a2a.fechar()
+
+async def descobrir_agentes() -> dict:
+    cartoes = {}
+    for url_base, resultado in zip(AGENTES, await asyncio.gather(
+            *(a2a.descobrir(url_base) for url_base in AGENTES), return_exceptions=True)):
+        if isinstance(resultado, CartaoAgente):
+            cartoes[url_base] = resultado.como_dict()
+        else:
+            print(f"Aviso: {resultado}")
+            cartoes[url_base] = None
+    return cartoes
+
+# --- DEFINIÇÃO DA API COM FASTAPI ---
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    # Server-Timing: hops no DevTools; Retry-After: agente ainda carregando (503)
+    expose_headers=["Server-Timing", "Retry-After"],
+)
+
+class ExamRequest(BaseModel):
+    message: str
+    num_questions: int = 10
+
+class ExamResponse(BaseModel):
+    challenges: List[Any]
+    prewarm: Any # Se o pré-aquecimento foi agendado (ele roda depois da resposta)
+    trace: Any
+
+class ExamAnswer(BaseModel):
+    challenge: Any
+    user_answer: str
+
+class ExamValidationRequest(BaseModel):
+    answers: List[ExamAnswer]
+
+class ExamValidationResponse(BaseModel):
+    # Um {"is_correct", "feedback"} por resposta, na mesma ordem; se o agente
+    # falhar, {"is_correct": None, "error", "status"} (questão não avaliada)
+    results: List[Any]
+    trace: Any
+
+AGENT_CARD = {
+  "a2a_version": "0.1.0",
+  "id": "agent-orchestrator-v1",
+  "name": "Orquestrador",
+  "description": "Combina o Mestre de Desafios e o Avaliador Implacável em operações compostas.",
+  "capabilities": [
+    {
+      "id": "generate-exam",
+      "description": "Gera uma prova e pré-aquece o contexto de validação das suas questões.",
+      "type": "http",
+      "endpoint": "/api/exam",
+      "method": "POST",
+      "request_schema": {
+        "type": "object",
+        "properties": {
+          "message": { "type": "string", "description": "O tópico da prova" },
+          "num_questions": { "type": "integer", "description": "Número de questões (default: 10)" }
+        },
+        "required": ["message"]
+      },
+      "response_schema": {
+        "type": "object",
+        "properties": {
+          "challenges": { "type": "array", "items": { "type": "object" } },
+          "prewarm": { "type": "object" },
+          "trace": { "type": "object" }
+        }
+      }
+    },
+    {
+      "id": "validate-exam",
+      "description": "Valida todas as respostas de uma prova em paralelo; questões que o agente não conseguiu avaliar voltam com is_correct nulo e o erro.",
+      "type": "http",
+      "endpoint": "/api/exam/validate",
+      "method": "POST",
+      "request_schema": {
+        "type": "object",
+        "properties": {
+          "answers": {
+            "type": "array",
+            "items": {
+              "type": "object",
+              "properties": {
+                "challenge": { "type": "object" },
+                "user_answer": { "type": "string" }
+              }
+            }
+          }
+        },
+        "required": ["answers"]
+      },
+      "response_schema": {
+        "type": "object",
+        "properties": {
+          "results": { "type": "array", "items": { "type": "object" } },
+          "trace": { "type": "object" }
+        }
+      }
+    }
+  ]
+}
+
+@app.get("/.well-known/agent.json", response_model=None)
+async def get_agent_card():
+    return AGENT_CARD
+
+async def verificar_agente(url_base: str) -> dict:
+    try:
+        cartao = await a2a.descobrir(url_base)
+    except ErroA2A as e:
+        return {"url": url_base, "ready": False, "error": str(e)}
+    saude = await a2a.saude(url_base)
+    return {**cartao.como_dict(), "ready": saude["ready"], "health": saude}
+
+@app.get("/health", response_model=None)
+async def health():
+    """
+    200 quando todos os agentes estão prontos (o /health de cada um responde
+    200); 503 enquanto algum ainda carrega, falhou ou não foi descoberto.
+    """
+    agentes = await asyncio.gather(*(verificar_agente(url_base) for url_base in AGENTES))
+    pronto = all(agente["ready"] for agente in agentes)
+    return JSONResponse(status_code=200 if pronto else 503, content={"ready": pronto, "agents": agentes})
+
+async def pre_aquecer(challenges: list, rastro: Rastro):
+    try:
+        await a2a.chamar(VALIDATION_AGENT_URL, "prewarm-context", {"challenges": challenges}, rastro)
+    except ErroA2A as e:
+        print(f"Aviso: pré-aquecimento falhou: {e}")
+
+@app.post("/api/exam", response_model=ExamResponse)
+async def generate_exam(request: ExamRequest, response: Response) -> ExamResponse:
+    rastro = Rastro()
+    try:
+        gerado = await a2a.chamar(CHALLENGE_AGENT_URL, "generate-multiple-choice", {
+            "message": request.message,
+            "num_questions": request.num_questions
+        }, rastro)
+    except ErroA2A as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+
+    challenges = gerado.get("challenges", [])
+
+    # Pré-aquece a validação em segundo plano, enquanto o usuário lê a prova:
+    # a resposta não espera por ele. O hop entra no rastro (e no log) quando
+    # terminar; uma falha só deixa a validação mais lenta.
+    prewarm = None
+    if any(isinstance(c, dict) and c.get("type") != "error" for c in challenges):
+        tarefa = asyncio.create_task(pre_aquecer(challenges, rastro))
+        tarefas_prewarm.add(tarefa)
+        tarefa.add_done_callback(tarefas_prewarm.discard)
+        prewarm = {"status": "agendado", "trace_id": rastro.trace_id}
+
+    response.headers["Server-Timing"] = rastro.server_timing()
+    return ExamResponse(challenges=challenges, prewarm=prewarm, trace=rastro.como_dict())
+
+@app.post("/api/exam/validate", response_model=ExamValidationResponse)
+async def validate_exam(request: ExamValidationRequest, response: Response) -> ExamValidationResponse:
+    rastro = Rastro()
+    limite = asyncio.Semaphore(MAX_VALIDACOES_PARALELAS)
+
+    async def validar(resposta: ExamAnswer):
+        async with limite:
+            try:
+                return await a2a.chamar(VALIDATION_AGENT_URL, "validate-answer", {
+                    "challenge": resposta.challenge,
+                    "user_answer": resposta.user_answer
+                }, rastro)
+            except ErroA2A as e:
+                print(f"Erro ao validar questão: {e}")
+                return e
+
+    results = await asyncio.gather(*(validar(resposta) for resposta in request.answers))
+
+    # Agente de validação carregando para todas as questões: o cliente tenta de novo
+    if results and all(isinstance(r, ErroA2A) and r.status_code == 503 for r in results):
+        raise HTTPException(status_code=503, detail=str(results[0]), headers=results[0].headers)
+    # Uma falha (prazo do LLM, agente fora) não é uma resposta errada: a
+    # questão volta como não avaliada, com o erro e o status do agente
+    results = [
+        {"is_correct": None, "error": str(r), "status": r.status_code} if isinstance(r, ErroA2A) else r
+        for r in results
+    ]
+
+    response.headers["Server-Timing"] = rastro.server_timing()
+    return ExamValidationResponse(results=results, trace=rastro.como_dict())
+
+if __name__ == "__main__":
+    import uvicorn
+    print("Iniciando o ORQUESTRADOR A2A em http://localhost:8003")
+    uvicorn.run(app, host="0.0.0.0", port=8003)
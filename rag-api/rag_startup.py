@@ -0,0 +1,199 @@
+# Inicialização do RAG compartilhada por main.py, challenge_agent.py e validation_agent.py
+#
+# As dependências pesadas (LangChain, sentence-transformers/torch, FAISS, pypdf e
+# langchain_google_genai) só são importadas dentro de `carregar_rag`, que roda em
+# uma tarefa de startup numa thread separada. Assim o uvicorn abre a porta na hora
+# e endpoints leves (ex: /.well-known/agent.json) respondem enquanto o modelo de
+# embedding e o Vector DB ainda estão sendo carregados.
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+
+from llm_client import criar_cliente_gemini
+
+# --- CONFIGURAÇÃO COMUM ---
+model_name = "sentence-transformers/all-MiniLM-L6-v2"
+model_kwargs = {'device': 'cpu'}
+encode_kwargs = {'normalize_embeddings': False}
+
+lista_de_documentos_pdf = [
+    "Documentação Syna.pdf",
+    "Python do ZERO à Programação Orientada a Objetos (Fernando Belomé Feltrin).pdf"
+    # Adicione aqui os PDFs de JavaScript, C++, Cachorros, etc.
+]
+
+# Hedged requests duplicam o custo da chamada no pior caso; ligue com LLM_HEDGE=1
+LLM_HEDGE = os.getenv("LLM_HEDGE", "0") == "1"
+
+STATUS_CARREGANDO = "carregando"
+STATUS_PRONTO = "pronto"
+STATUS_ERRO = "erro"
+
+
+class EstadoRAG:
+    """
+    Componentes carregados de um agente (llm, retriever, prompt) e o seu
+    estado de prontidão, consultado pelos endpoints e por /health.
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.status = STATUS_CARREGANDO
+        self.erro = None
+        self.llm = None
+        self.retriever = None
+        self.prompt = None
+        self.tempo_inicio = time.monotonic()
+        self.tempo_carregamento = None
+        self.tarefa = None
+
+    @property
+    def pronto(self) -> bool:
+        return self.status == STATUS_PRONTO
+
+    def exigir_pronto(self):
+        """Levanta 503 enquanto o carregamento não terminou (ou se falhou)."""
+        if self.status == STATUS_CARREGANDO:
+            raise HTTPException(
+                status_code=503,
+                detail=f"O agente '{self.nome}' ainda está carregando o modelo e os documentos. Tente novamente em instantes.",
+                headers={"Retry-After": "5"},
+            )
+        if self.status == STATUS_ERRO:
+            raise HTTPException(
+                status_code=503,
+                detail=f"O agente '{self.nome}' falhou ao inicializar: {self.erro}",
+            )
+
+    def como_dict(self) -> dict:
+        return {
+            "agent": self.nome,
+            "status": self.status,
+            "ready": self.pronto,
+            "rag_enabled": self.retriever is not None,
+            "error": self.erro,
+            "uptime_s": round(time.monotonic() - self.tempo_inicio, 3),
+            "load_time_s": self.tempo_carregamento,
+            "llm": self.llm.como_dict() if self.llm is not None else None,
+        }
+
+
+def carregar_documentos(rotulo: str = "") -> list:
+    from langchain_community.document_loaders import PyPDFLoader
+
+    documentos_totais = []
+    print(f"Iniciando o carregamento dos documentos locais{rotulo}...")
+    for caminho_do_pdf in lista_de_documentos_pdf:
+        try:
+            if not os.path.exists(caminho_do_pdf):
+                print(f"Erro: Arquivo não encontrado no caminho: {caminho_do_pdf}")
+                print(f"Pulando o arquivo '{caminho_do_pdf}'...")
+                continue
+            loader = PyPDFLoader(caminho_do_pdf)
+            paginas = loader.load()
+            documentos_totais.extend(paginas)
+            print(f"Documento '{caminho_do_pdf}' carregado com sucesso ({len(paginas)} páginas).")
+        except Exception as e:
+            print(f"Erro ao processar o PDF '{caminho_do_pdf}': {e}")
+            print(f"Pulando o arquivo '{caminho_do_pdf}'...")
+    print(f"\nCarregamento concluído. Total de páginas de todos os documentos: {len(documentos_totais)}")
+    return documentos_totais
+
+
+def carregar_rag(estado: EstadoRAG, *, modelo_llm: str, temperatura: float,
+                 texto_prompt: str, retriever_kwargs: dict, rotulo: str = "",
+                 modelo_fallback: str = None, prazo_llm: float = 60.0,
+                 timeout_tentativa_llm: float = None):
+    """
+    Carrega embeddings, LLM, prompt e Vector DB. Roda fora do event loop
+    (asyncio.to_thread) e nunca levanta: falhas ficam registradas em `estado`.
+    """
+    inicio = time.monotonic()
+    try:
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        from langchain.prompts import ChatPromptTemplate
+
+        try:
+            embeddings = HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs=model_kwargs,
+                encode_kwargs=encode_kwargs
+            )
+        except Exception as e:
+            print(f"Erro ao carregar o modelo de embedding: {e}")
+            raise
+
+        estado.llm = criar_cliente_gemini(
+            modelo_llm, temperatura,
+            modelo_fallback=modelo_fallback,
+            prazo_padrao=prazo_llm,
+            timeout_tentativa=timeout_tentativa_llm,
+            hedge=LLM_HEDGE,
+        )
+        estado.prompt = ChatPromptTemplate.from_template(texto_prompt)
+
+        documentos_totais = carregar_documentos(rotulo)
+
+        # --- Dividir os documentos e criar o Vector DB ---
+        if documentos_totais:
+            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
+            chunks = text_splitter.split_documents(documentos_totais)
+            print(f"Criando Vector DB com {len(chunks)} chunks de {len(lista_de_documentos_pdf)} documento(s)...")
+            vector_db = FAISS.from_documents(chunks, embeddings)
+            estado.retriever = vector_db.as_retriever(**retriever_kwargs)
+            print(f"Vector DB{rotulo} criado com sucesso!")
+        else:
+            print("Nenhum documento foi carregado. A API não pode iniciar o RAG.")
+
+        estado.status = STATUS_PRONTO
+    except Exception as e:
+        estado.erro = str(e)
+        estado.status = STATUS_ERRO
+        print(f"Erro ao inicializar o agente '{estado.nome}': {e}")
+    finally:
+        estado.tempo_carregamento = round(time.monotonic() - inicio, 3)
+
+
+def criar_lifespan(estado: EstadoRAG, **config):
+    """
+    Lifespan do FastAPI que dispara `carregar_rag` em segundo plano sem
+    bloquear o startup (o uvicorn só abre a porta depois que o lifespan cede).
+    """
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        estado.tempo_inicio = time.monotonic()
+        # Guarda a referência da tarefa para ela não ser coletada pelo GC
+        estado.tarefa = asyncio.create_task(asyncio.to_thread(carregar_rag, estado, **config))
+        yield
+
+    return lifespan
+
+
+def registrar_health(app: FastAPI, estado: EstadoRAG):
+    """
+    Adiciona GET /health (prontidão): 200 quando pronto, 503 enquanto carrega
+    ou após falha. O corpo traz o status e o tempo de carregamento.
+    """
+    @app.get("/health", response_model=None)
+    async def health():
+        return JSONResponse(status_code=200 if estado.pronto else 503, content=estado.como_dict())
+
+
+def registrar_server_timing(app: FastAPI):
+    """
+    Adiciona o header `Server-Timing: app;dur=<ms>` em todas as respostas,
+    para o orquestrador separar o tempo gasto no agente do tempo de rede.
+    """
+    @app.middleware("http")
+    async def server_timing(request, call_next):
+        inicio = time.perf_counter()
+        resposta = await call_next(request)
+        resposta.headers["Server-Timing"] = f"app;dur={(time.perf_counter() - inicio) * 1000:.1f}"
+        return resposta
@@ -0,0 +1,160 @@
+# Cenários do ClienteLLM (llm_client.py) contra o upstream falso (fake_upstream.py)
+#
+#     cd rag-api && pip install -r requirements-dev.txt
+#     python -m pytest test_llm_client.py
+#
+# Os cenários verificam contadores e número de chamadas; só o teste do prazo
+# mede o relógio, com folga para máquinas de CI carregadas.
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from fake_upstream import ErroUpstreamFalso, ModeloFalso
+from llm_client import ClienteLLM, ErroLLM, TimeoutLLM
+
+
+def _rodar(cliente: ClienteLLM, prazo: float):
+    """Executa uma chamada e devolve (resultado ou exceção, duração em s)."""
+    async def chamar():
+        try:
+            return await cliente.ainvoke("pergunta", prazo=prazo)
+        except Exception as e:
+            return e
+
+    inicio = time.monotonic()
+    resultado = asyncio.run(chamar())
+    return resultado, time.monotonic() - inicio
+
+
+def _aquecer(cliente: ClienteLLM, nome: str, latencias: list):
+    for latencia in latencias:
+        cliente.latencias[nome].registrar(latencia)
+
+
+@pytest.fixture(autouse=True)
+def jitter_deterministico():
+    random.seed(0)
+
+
+def test_prazo_corta_upstream_travado():
+    travado = ModeloFalso("flash", [("trava", None)])
+    # Sem o prazo, as 21 tentativas de 0.5s levariam mais de 10s
+    cliente = ClienteLLM(travado, "flash", timeout_tentativa=0.5, max_retries=20, backoff_base=0.05)
+
+    resultado, duracao = _rodar(cliente, 1.5)
+
+    assert isinstance(resultado, TimeoutLLM)
+    assert duracao < 1.5 * 2
+    assert travado.chamadas >= 2
+    assert cliente.contadores["timeouts"] == 1
+
+
+def test_chamada_longa_pode_usar_o_prazo_inteiro():
+    # Sem timeout por tentativa, uma única chamada lenta cabe no prazo
+    lento = ModeloFalso("flash", [("ok", 0.8)])
+    cliente = ClienteLLM(lento, "flash")
+
+    resultado, _ = _rodar(cliente, 1.0)
+
+    assert resultado == "flash: resposta para 'pergunta'"
+    assert lento.chamadas == 1
+    assert cliente.contadores["retries"] == 0
+
+
+def test_retries_em_erros_transitorios():
+    instavel = ModeloFalso("flash", [("erro", 503), ("erro", 429), ("ok", 0.05)])
+    cliente = ClienteLLM(instavel, "flash", max_retries=3, backoff_base=0.1)
+
+    resultado, _ = _rodar(cliente, 5)
+
+    assert resultado == "flash: resposta para 'pergunta'"
+    assert instavel.chamadas == 3
+    assert cliente.contadores["retries"] == 2
+
+
+def test_retries_esgotados_viram_erro_llm():
+    instavel = ModeloFalso("flash", [("erro", 503)])
+    cliente = ClienteLLM(instavel, "flash", max_retries=2, backoff_base=0.01)
+
+    resultado, _ = _rodar(cliente, 5)
+
+    assert type(resultado) is ErroLLM
+    assert instavel.chamadas == 3
+
+
+def test_erro_nao_transitorio_nao_e_repetido():
+    invalido = ModeloFalso("flash", [("erro", 400)])
+    cliente = ClienteLLM(invalido, "flash", max_retries=3, backoff_base=0.1)
+
+    resultado, _ = _rodar(cliente, 5)
+
+    assert isinstance(resultado, ErroUpstreamFalso)
+    assert invalido.chamadas == 1
+    assert cliente.contadores["retries"] == 0
+
+
+def test_hedge_apos_p95():
+    # A primeira chamada nunca responde: só a segunda (disparada após o p95) pode vencer
+    cauda = ModeloFalso("flash", [("trava", None), ("ok", 0.1)])
+    cliente = ClienteLLM(cauda, "flash", hedge=True, hedge_min_amostras=20)
+    _aquecer(cliente, "flash", [0.1] * 19 + [0.2])
+
+    resultado, _ = _rodar(cliente, 5)
+
+    assert resultado == "flash: resposta para 'pergunta'"
+    assert cauda.chamadas == 2
+    assert cliente.contadores["hedges"] == 1
+    assert cliente.contadores["retries"] == 0
+
+
+def test_sem_hedge_sem_amostras_suficientes():
+    cauda = ModeloFalso("flash", [("ok", 0.3)])
+    cliente = ClienteLLM(cauda, "flash", hedge=True, hedge_min_amostras=20)
+
+    _rodar(cliente, 5)
+
+    assert cauda.chamadas == 1
+    assert cliente.contadores["hedges"] == 0
+
+
+def test_fallback_quando_orcamento_em_risco():
+    pro = ModeloFalso("pro", [("ok", 3.0)])
+    flash = ModeloFalso("flash", [("ok", 0.1)])
+    cliente = ClienteLLM(pro, "pro", fallback=flash, nome_fallback="flash", hedge_min_amostras=20)
+    _aquecer(cliente, "pro", [3.0] * 20)
+
+    resultado, _ = _rodar(cliente, 2)
+
+    assert resultado == "flash: resposta para 'pergunta'"
+    assert (pro.chamadas, flash.chamadas) == (0, 1)
+    assert cliente.contadores["fallbacks"] == 1
+
+
+def test_fallback_apos_timeout_do_principal():
+    pro = ModeloFalso("pro", [("trava", None)])
+    flash = ModeloFalso("flash", [("ok", 0.1)])
+    cliente = ClienteLLM(pro, "pro", fallback=flash, nome_fallback="flash",
+                         timeout_tentativa=0.5, latencia_esperada=0.3, backoff_base=0.05)
+
+    resultado, _ = _rodar(cliente, 3)
+
+    assert resultado == "flash: resposta para 'pergunta'"
+    assert (pro.chamadas, flash.chamadas) == (1, 1)
+    assert cliente.contadores["fallbacks"] == 1
+
+
+def test_fallback_apos_504_do_transporte():
+    # O timeout do transporte pode disparar antes do wait_for da tentativa
+    pro = ModeloFalso("pro", [("erro", 504)])
+    flash = ModeloFalso("flash", [("ok", 0.1)])
+    cliente = ClienteLLM(pro, "pro", fallback=flash, nome_fallback="flash",
+                         latencia_esperada=0.3, backoff_base=0.05)
+
+    resultado, _ = _rodar(cliente, 3)
+
+    assert resultado == "flash: resposta para 'pergunta'"
+    assert (pro.chamadas, flash.chamadas) == (1, 1)
+    assert cliente.contadores["fallbacks"] == 1
@@ -1,98 +1,28 @@
 # Nome sugerido para este arquivo: validation_agent.py
 # VERSÃO COM CORREÇÃO DEFINITIVA (AGORA USANDO RAG/LLM PARA FEEDBACK)
 
-import os
-import requests
+import asyncio
 import json
-from io import BytesIO
-from fastapi import FastAPI
+from collections import OrderedDict
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Any, List
 from operator import itemgetter # Importe itemgetter
 
-# Importações do LangChain
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
-from langchain.schema.output_parser import StrOutputParser
-
 
 # Carregue sua chave de API a partir de um arquivo .env (recomendado)
 from dotenv import load_dotenv
 load_dotenv()
 
-from collections import Counter
 import re
 
-# --- CONFIGURAÇÃO INICIAL E CARREGAMENTO DO MODELO ---
-model_name = "sentence-transformers/all-MiniLM-L6-v2"
-model_kwargs = {'device': 'cpu'}
-encode_kwargs = {'normalize_embeddings': False}
-
-try:
-    embeddings = HuggingFaceEmbeddings(
-        model_name=model_name,
-        model_kwargs=model_kwargs,
-        encode_kwargs=encode_kwargs
-    )
-except Exception as e:
-    print(f"Erro ao carregar o modelo de embedding: {e}")
-    exit()
+# As importações do LangChain, o modelo de embedding e o Vector DB são
+# carregados em segundo plano no startup (ver rag_startup.py)
+from rag_startup import EstadoRAG, criar_lifespan, registrar_health, registrar_server_timing
+from llm_client import TimeoutLLM, ErroLLM
 
-# LLM para validação (temperatura baixa para ser um "juiz" rigoroso)
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-pro", temperature=0.1) 
-
-lista_de_documentos_pdf = [
-    "Documentação Syna.pdf",
-    "Python do ZERO à Programação Orientada a Objetos (Fernando Belomé Feltrin).pdf"
-]
-documentos_totais = []
-print("Iniciando o carregamento dos documentos locais (Agente de Validação)...")
-for caminho_do_pdf in lista_de_documentos_pdf:
-    try:
-        if not os.path.exists(caminho_do_pdf):
-            print(f"Erro: Arquivo não encontrado no caminho: {caminho_do_pdf}")
-            print(f"Pulando o arquivo '{caminho_do_pdf}'...")
-            continue
-        loader = PyPDFLoader(caminho_do_pdf)
-        paginas = loader.load()
-        documentos_totais.extend(paginas)
-        print(f"Documento '{caminho_do_pdf}' carregado com sucesso ({len(paginas)} páginas).")
-    except Exception as e:
-        print(f"Erro ao processar o PDF '{caminho_do_pdf}': {e}")
-        print(f"Pulando o arquivo '{caminho_do_pdf}'...")
-print(f"\nCarregamento concluído. Total de páginas de todos os documentos: {len(documentos_totais)}")
-
-# --- Dividir os documentos e criar o Vector DB ---
-vector_db = None
-if documentos_totais:
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
-    chunks = text_splitter.split_documents(documentos_totais)
-    print(f"Criando Vector DB com {len(chunks)} chunks de {len(lista_de_documentos_pdf)} documento(s)...")
-    vector_db = FAISS.from_documents(chunks, embeddings)
-    
-    # Retriever padrão focado em relevância (k=5)
-    retriever = vector_db.as_retriever(search_kwargs={"k": 5})
-    print("Vector DB (Validação) criado com sucesso!")
-else:
-    print("Nenhum documento foi carregado. A API não pode iniciar o RAG.")
-    retriever = None
-
-# --- DEFINIÇÃO DA API COM FASTAPI ---
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"], # Permite todas as origens (ajuste para produção)
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+rag = EstadoRAG("validacao")
 
 # --- Modelos Pydantic para Validação ---
 
@@ -104,7 +34,14 @@ class ValidationResponse(BaseModel):
     is_correct: bool
     feedback: str
 
-prompt_template_validation = ChatPromptTemplate.from_template("""
+class PrewarmRequest(BaseModel):
+    challenges: List[Any] # Os desafios recém-gerados (ex: uma prova inteira)
+
+class PrewarmResponse(BaseModel):
+    queries: int # Quantas buscas foram preparadas
+    cached: int  # Quantas já estavam no cache
+
+PROMPT_TEMPLATE_VALIDATION = """
     Você é um Agente Avaliador robótico e implacável. Sua única missão é
     determinar se a "RESPOSTA DO USUÁRIO" é factualmente correta,
     baseando-se EXCLUSIVAMENTE no "CONTEXTO DA DOCUMENTAÇÃO (GABARITO)".
@@ -153,7 +90,34 @@ prompt_template_validation = ChatPromptTemplate.from_template("""
     }}
 
     OBJETO JSON DE AVALIAÇÃO:
-""")
+"""
+
+# --- DEFINIÇÃO DA API COM FASTAPI ---
+# LLM para validação (temperatura baixa para ser um "juiz" rigoroso)
+app = FastAPI(lifespan=criar_lifespan(
+    rag,
+    modelo_llm="gemini-2.5-pro",
+    temperatura=0.1,
+    # Se o prazo estiver em risco, o flash responde no lugar do pro
+    modelo_fallback="gemini-2.5-flash",
+    prazo_llm=45.0,
+    # O pro pode usar até 30s; o que sobrar fica para o flash em caso de timeout
+    timeout_tentativa_llm=30.0,
+    texto_prompt=PROMPT_TEMPLATE_VALIDATION,
+    # Retriever padrão focado em relevância (k=5)
+    retriever_kwargs={"search_kwargs": {"k": 5}},
+    rotulo=" (Agente de Validação)",
+))
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"], # Permite todas as origens (ajuste para produção)
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+registrar_server_timing(app)
 
 
 AGENT_CARD = {
@@ -183,6 +147,27 @@ AGENT_CARD = {
           "feedback": { "type": "string" }
         }
       }
+    },
+    {
+      "id": "prewarm-context",
+      "description": "Pré-carrega o contexto da documentação usado para validar as respostas de uma lista de desafios.",
+      "type": "http",
+      "endpoint": "/api/validate/prewarm",
+      "method": "POST",
+      "request_schema": {
+        "type": "object",
+        "properties": {
+          "challenges": { "type": "array", "items": { "type": "object" }, "description": "Os desafios que serão validados depois" }
+        },
+        "required": ["challenges"]
+      },
+      "response_schema": {
+        "type": "object",
+        "properties": {
+          "queries": { "type": "integer" },
+          "cached": { "type": "integer" }
+        }
+      }
     }
   ]
 }
@@ -195,6 +180,58 @@ async def get_agent_card():
     """
     return AGENT_CARD
 
+registrar_health(app, rag)
+
+# --- Cache do contexto recuperado ---
+# A chave é a search_query exata de /api/validate, então uma resposta vinda do
+# cache é idêntica à que o retriever daria. O orquestrador pré-aquece o cache
+# logo após gerar uma prova (ver /api/validate/prewarm).
+MAX_CONTEXTO_CACHE = 2048
+contexto_cache = OrderedDict()
+
+async def buscar_contexto(search_query: str):
+    documentos = contexto_cache.get(search_query)
+    if documentos is not None:
+        contexto_cache.move_to_end(search_query)
+        return documentos
+    documentos = await rag.retriever.ainvoke(search_query)
+    contexto_cache[search_query] = documentos
+    if len(contexto_cache) > MAX_CONTEXTO_CACHE:
+        contexto_cache.popitem(last=False)
+    return documentos
+
+def montar_search_query(challenge: dict, user_answer: str) -> str:
+    # O contexto do desafio + a resposta do usuário.
+    # Isso ajuda a encontrar os trechos mais relevantes da documentação.
+    return challenge.get("description", "") + " " + user_answer
+
+def consultas_previstas(challenge: dict) -> List[str]:
+    """
+    As search_queries que /api/validate vai usar para este desafio: resposta
+    em branco e, em múltipla escolha, o id de cada opção.
+    """
+    respostas = [""]
+    for opcao in challenge.get("options") or []:
+        if isinstance(opcao, dict) and "id" in opcao:
+            respostas.append(str(opcao["id"]))
+    return [montar_search_query(challenge, resposta) for resposta in respostas]
+
+@app.post("/api/validate/prewarm", response_model=PrewarmResponse)
+async def prewarm_context(request: PrewarmRequest) -> PrewarmResponse:
+    rag.exigir_pronto()
+
+    if not rag.retriever:
+        return PrewarmResponse(queries=0, cached=0)
+
+    consultas = set()
+    for challenge in request.challenges:
+        if isinstance(challenge, dict) and challenge.get("type") != "error":
+            consultas.update(consultas_previstas(challenge))
+
+    cached = sum(1 for consulta in consultas if consulta in contexto_cache)
+    await asyncio.gather(*(buscar_contexto(consulta) for consulta in consultas))
+    return PrewarmResponse(queries=len(consultas), cached=cached)
+
 # === FUNÇÃO MODIFICADA ===
 @app.post("/api/validate", response_model=ValidationResponse)
 async def validate_answer(request: ValidationRequest) -> ValidationResponse:
@@ -207,7 +244,9 @@ async def validate_answer(request: ValidationRequest) -> ValidationResponse:
     print(f"user_answer: {request.user_answer}")
 
     # Verifica se o RAG está pronto
-    if not retriever:
+    rag.exigir_pronto()
+
+    if not rag.retriever:
         return ValidationResponse(
             is_correct=False,
             feedback="Desculpe, o sistema de RAG (Validação) não foi inicializado. Documentos não carregados."
@@ -223,30 +262,29 @@ async def validate_answer(request: ValidationRequest) -> ValidationResponse:
     # Para o LLM, o objeto JSON do desafio deve ser uma string formatada
     challenge_json_string = json.dumps(request.challenge, ensure_ascii=False, indent=2)
     
-    # O que o retriever deve buscar? O contexto do desafio + a resposta do usuário.
-    # Isso ajuda a encontrar os trechos mais relevantes da documentação.
-    search_query = request.challenge.get("description", "") + " " + request.user_answer
+    # O que o retriever deve buscar? (ver montar_search_query)
+    search_query = montar_search_query(request.challenge, request.user_answer)
 
     # Definir a chain de validação
     # Usamos os componentes que já foram carregados (llm, retriever, prompt)
     validation_chain = (
         {
-            "context": itemgetter("search_query") | retriever, # Usa a query para buscar
+            "context": itemgetter("context"),                 # Trechos já recuperados (com cache)
             "challenge_json": itemgetter("challenge_json"),   # Passa a string JSON
             "user_answer": itemgetter("user_answer")          # Passa a resposta do usuário
         }
-        | prompt_template_validation
-        | llm
-        | StrOutputParser() # O LLM vai retornar uma string JSON
+        | rag.prompt
     )
 
     try:
-        # Invocar a chain
-        raw_response = validation_chain.invoke({
-            "search_query": search_query,
+        # Buscar o contexto, invocar a chain e depois o LLM (que vai retornar uma string JSON)
+        contexto = await buscar_contexto(search_query)
+        mensagens = await validation_chain.ainvoke({
+            "context": contexto,
             "challenge_json": challenge_json_string,
             "user_answer": request.user_answer
         })
+        raw_response = await rag.llm.ainvoke(mensagens)
 
         print(f"DEBUG: Resposta crua do LLM: {raw_response}")
 
@@ -283,6 +321,12 @@ async def validate_answer(request: ValidationRequest) -> ValidationResponse:
             is_correct=False,
             feedback=f"Ocorreu um erro ao processar a avaliação. A resposta do avaliador não foi um JSON válido. (Raw: {raw_response})"
         )
+    # LLM lento ou fora do ar não é erro do usuário: responde 504/502 em vez de
+    # devolver um resultado (que contaria a resposta como errada)
+    except TimeoutLLM as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ErroLLM as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         print(f"Erro inesperado na chain de validação: {e}")
         return ValidationResponse(
@@ -6,6 +6,8 @@ const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
 const CHALLENGE_API_BASE_URL = import.meta.env.VITE_CHALLENGE_API_URL || "http://localhost:8001";
 // +++ ADICIONADO: URL do Agente de Validação (porta 8002) +++
 const VALIDATION_API_BASE_URL = import.meta.env.VITE_VALIDATION_API_URL || "http://localhost:8002";
+// Orquestrador A2A (porta 8003): operações compostas em uma única chamada
+const ORCHESTRATOR_API_BASE_URL = import.meta.env.VITE_ORCHESTRATOR_API_URL || "http://localhost:8003";
 
 
 // Endpoints específicos
@@ -13,6 +15,8 @@ export const CHAT_ENDPOINT = `${API_BASE_URL}/api/chat`;
 export const CHALLENGE_ENDPOINT = `${CHALLENGE_API_BASE_URL}/api/challenge`;
 // +++ ADICIONADO: Endpoint de Validação +++
 export const VALIDATION_ENDPOINT = `${VALIDATION_API_BASE_URL}/api/validate`;
+export const EXAM_ENDPOINT = `${ORCHESTRATOR_API_BASE_URL}/api/exam`;
+export const EXAM_VALIDATION_ENDPOINT = `${ORCHESTRATOR_API_BASE_URL}/api/exam/validate`;
 
 export interface ChatApiRequest {
   message: string;
@@ -38,6 +42,25 @@ export interface ValidationApiResponse {
   feedback: string;
 }
 
+// Interfaces do Orquestrador
+export interface ExamApiResponse extends ChallengeApiResponse {
+  prewarm: unknown;
+  trace: unknown;
+}
+
+// Resultado de uma questão da prova: is_correct null = não avaliada (o agente falhou)
+export interface ExamValidationResult {
+  is_correct: boolean | null;
+  feedback?: string;
+  error?: string;
+  status?: number;
+}
+
+export interface ExamValidationApiResponse {
+  results: ExamValidationResult[];
+  trace: unknown;
+}
+
 
 /**
  * Send a message to the RAG API and get a response
@@ -144,4 +167,81 @@ export async function validateChallengeAnswer(
       feedback: "Erro ao conectar com o agente de validação. Por favor, tente novamente."
     };
   }
-}
\ No newline at end of file
+}
+
+/**
+ * Generates an exam through the orchestrator, which also pre-warms the
+ * Validation Agent's context for its questions (one round-trip).
+ */
+export async function generateExam(topic: string, numQuestions?: number): Promise<ChallengeApiResponse> {
+  try {
+    const response = await fetch(EXAM_ENDPOINT, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ message: topic, num_questions: numQuestions } as ChatApiRequest),
+    });
+
+    if (!response.ok) {
+      let errorDetail = `Exam API error: ${response.status} ${response.statusText}`;
+      try {
+          const errorJson = await response.json();
+          errorDetail = errorJson.detail || errorDetail;
+      } catch (e) { /* Ignora se não for JSON */ }
+      throw new Error(errorDetail);
+    }
+
+    const data: ExamApiResponse = await response.json();
+    console.debug("Exam trace:", data.trace);
+    return { challenges: data.challenges };
+  } catch (error) {
+    console.error("Error calling exam API:", error);
+    return {
+      challenges: [{
+        id: "error-fetch",
+        title: "Erro de Rede",
+        description: error instanceof Error ? error.message : "Não foi possível conectar ao orquestrador.",
+        type: "error",
+        difficulty: "none"
+      }]
+    };
+  }
+}
+
+/**
+ * Validates all answers of an exam through the orchestrator (in parallel).
+ *
+ * @returns One validation result per answer, in the same order. Answers the
+ * agent could not evaluate come back with `is_correct: null`.
+ * @throws If the whole request fails (e.g. 503 while the agent is loading),
+ * so the exam can be submitted again instead of being graded as wrong.
+ */
+export async function validateExamAnswers(
+  answers: ValidationApiRequest[]
+): Promise<ExamValidationResult[]> {
+  const response = await fetch(EXAM_VALIDATION_ENDPOINT, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ answers }),
+  });
+
+  if (!response.ok) {
+    let errorDetail = `Exam validation API error: ${response.status} ${response.statusText}`;
+    try {
+        const errorJson = await response.json();
+        errorDetail = errorJson.detail || errorDetail;
+    } catch (e) { /* Ignora se não for JSON */ }
+    const retryAfter = response.headers.get("Retry-After");
+    if (retryAfter) {
+      errorDetail += ` Tente novamente em ${retryAfter}s.`;
+    }
+    throw new Error(errorDetail);
+  }
+
+  const data: ExamValidationApiResponse = await response.json();
+  console.debug("Exam validation trace:", data.trace);
+  return data.results;
+}
@@ -8,9 +8,9 @@ import { Textarea } from "@/components/ui/textarea";
 import { Alert, AlertDescription } from "@/components/ui/alert";
 import { Progress } from "@/components/ui/progress";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { ArrowLeft, CheckCircle2, XCircle, Loader2, Clock, AlertTriangle, History } from "lucide-react";
+import { ArrowLeft, CheckCircle2, XCircle, HelpCircle, Loader2, Clock, AlertTriangle, History } from "lucide-react";
 import { Challenge } from "@/types/challenge";
-import { generateChallenges, validateChallengeAnswer, ValidationApiResponse } from "@/lib/api";
+import { generateExam, validateExamAnswers, ExamValidationResult } from "@/lib/api";
 import { useToast } from "@/hooks/use-toast";
 
 interface ExamHistory {
@@ -36,7 +36,7 @@ export default function Exam() {
   const [questions, setQuestions] = useState<Challenge[]>([]);
   const [currentQuestion, setCurrentQuestion] = useState(0);
   const [answers, setAnswers] = useState<Record<number, string>>({});
-  const [validationResults, setValidationResults] = useState<Record<number, ValidationApiResponse>>({});
+  const [validationResults, setValidationResults] = useState<Record<number, ExamValidationResult>>({});
   const [timeRemaining, setTimeRemaining] = useState(EXAM_TIME_LIMIT);
   const [examHistory, setExamHistory] = useState<ExamHistory[]>([]);
   const timerRef = useRef<NodeJS.Timeout | null>(null);
@@ -106,7 +106,8 @@ const startExam = async () => {
     try {
       // Gera desafios sobre conteúdos gerais do projeto
       // <<< MODIFICADO: Passando 10 como segundo argumento >>>
-      const response = await generateChallenges("conteúdos gerais do projeto", 10);
+      // A prova vem do orquestrador, que já pré-aquece a validação das questões
+      const response = await generateExam("conteúdos gerais do projeto", 10);
       
       if (response.challenges && response.challenges.length > 0) {
         setQuestions(response.challenges);
@@ -151,55 +152,53 @@ const startExam = async () => {
 
   const submitExam = async () => {
     setIsSubmittingExam(true);
-    const results: Record<number, ValidationApiResponse> = {};
+    const results: Record<number, ExamValidationResult> = {};
 
     try {
-      for (let i = 0; i < questions.length; i++) {
-        const question = questions[i];
-        const userAnswer = answers[i] || "";
-        
-        try {
-          const validation = await validateChallengeAnswer(question, userAnswer);
-          results[i] = validation;
-        } catch (error) {
-          console.error(`Erro ao validar questão ${i}:`, error);
-          results[i] = {
-            is_correct: false,
-            feedback: "Erro ao validar esta questão."
-          };
-        }
-      }
+      // Valida todas as respostas de uma vez (em paralelo no orquestrador)
+      const validations = await validateExamAnswers(
+        questions.map((question, i) => ({ challenge: question, user_answer: answers[i] || "" }))
+      );
+      validations.forEach((validation, i) => {
+        results[i] = validation;
+      });
 
       setValidationResults(results);
       setExamFinished(true);
       
       // Calculate score and save to history
-      const correctCount = Object.values(results).filter(r => r.is_correct).length;
-      const percentage = (correctCount / questions.length) * 100;
+      // Questões não avaliadas (is_correct null) ficam fora da nota
+      const evaluated = Object.values(results).filter(r => r.is_correct !== null);
+      const correctCount = evaluated.filter(r => r.is_correct).length;
+      const notEvaluatedCount = questions.length - evaluated.length;
       const timeSpent = EXAM_TIME_LIMIT - timeRemaining;
       
-      const newHistoryEntry: ExamHistory = {
-        id: Date.now().toString(),
-        date: new Date().toISOString(),
-        score: correctCount,
-        total: questions.length,
-        percentage,
-        timeSpent,
-      };
-
-      const updatedHistory = [newHistoryEntry, ...examHistory];
-      setExamHistory(updatedHistory);
-      localStorage.setItem("examHistory", JSON.stringify(updatedHistory));
+      if (evaluated.length > 0) {
+        const newHistoryEntry: ExamHistory = {
+          id: Date.now().toString(),
+          date: new Date().toISOString(),
+          score: correctCount,
+          total: evaluated.length,
+          percentage: (correctCount / evaluated.length) * 100,
+          timeSpent,
+        };
+
+        const updatedHistory = [newHistoryEntry, ...examHistory];
+        setExamHistory(updatedHistory);
+        localStorage.setItem("examHistory", JSON.stringify(updatedHistory));
+      }
       
       toast({
         title: "Prova Concluída!",
-        description: "Confira seus resultados abaixo.",
+        description: notEvaluatedCount > 0
+          ? `${notEvaluatedCount} questão(ões) não puderam ser avaliadas. Confira seus resultados abaixo.`
+          : "Confira seus resultados abaixo.",
       });
     } catch (error) {
       console.error("Erro ao submeter prova:", error);
       toast({
         title: "Erro",
-        description: "Falha ao submeter a prova.",
+        description: error instanceof Error ? error.message : "Falha ao submeter a prova.",
         variant: "destructive",
       });
     } finally {
@@ -211,6 +210,10 @@ const startExam = async () => {
     return Object.values(validationResults).filter((result) => result.is_correct).length;
   };
 
+  const getEvaluatedCount = () => {
+    return Object.values(validationResults).filter((result) => result.is_correct !== null).length;
+  };
+
   const restartExam = () => {
     if (timerRef.current) {
       clearInterval(timerRef.current);
@@ -227,8 +230,9 @@ const startExam = async () => {
   // Exam Results View
   if (examFinished) {
     const correctCount = getCorrectCount();
-    const totalQuestions = questions.length;
-    const percentage = Math.round((correctCount / totalQuestions) * 100);
+    const totalQuestions = getEvaluatedCount();
+    const notEvaluatedCount = questions.length - totalQuestions;
+    const percentage = totalQuestions > 0 ? Math.round((correctCount / totalQuestions) * 100) : 0;
 
     return (
       <div className="container mx-auto p-6 max-w-4xl">
@@ -253,6 +257,7 @@ const startExam = async () => {
               </div>
               <div className="text-muted-foreground mb-4">
                 Você acertou {percentage}% das questões
+                {notEvaluatedCount > 0 && ` (${notEvaluatedCount} não avaliada(s))`}
               </div>
               <Progress value={percentage} className="h-3" />
             </div>
@@ -262,17 +267,22 @@ const startExam = async () => {
         <div className="space-y-4">
           {questions.map((question, index) => {
             const result = validationResults[index];
+            const notEvaluated = result?.is_correct === null;
             const userAnswer = answers[index] || "Não respondida";
 
             return (
               <Card key={question.id} className="border-l-4" style={{
-                borderLeftColor: result?.is_correct ? "hsl(var(--success))" : "hsl(var(--destructive))"
+                borderLeftColor: notEvaluated
+                  ? "hsl(var(--muted-foreground))"
+                  : result?.is_correct ? "hsl(var(--success))" : "hsl(var(--destructive))"
               }}>
                 <CardHeader>
                   <div className="flex items-start justify-between">
                     <div className="flex-1">
                       <CardTitle className="text-lg flex items-center gap-2">
-                        {result?.is_correct ? (
+                        {notEvaluated ? (
+                          <HelpCircle className="h-5 w-5 text-muted-foreground" />
+                        ) : result?.is_correct ? (
                           <CheckCircle2 className="h-5 w-5 text-green-600" />
                         ) : (
                           <XCircle className="h-5 w-5 text-red-600" />
@@ -297,7 +307,15 @@ const startExam = async () => {
                     )}
                   </div>
 
-                  {result && (
+                  {notEvaluated && (
+                    <Alert>
+                      <AlertDescription className="text-sm">
+                        <strong>Não avaliada:</strong> {result?.error || "O avaliador não respondeu."}
+                      </AlertDescription>
+                    </Alert>
+                  )}
+
+                  {result && !notEvaluated && (
                     <Alert variant={result.is_correct ? "default" : "destructive"}>
                       <AlertDescription className="text-sm">
                         <strong>Feedback:</strong> {result.feedback}